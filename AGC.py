@@ -62,5 +62,6 @@ class Computer:
         self.registers[3] = 00000
         print(f"Registers: R1={self.registers[1]}, R2={self.registers[2]}, R3={self.registers[3]}")
     
-agc = Computer("CSM", "AGC")
-agc.execute_verb_noun(37, 1)  
\ No newline at end of file
+if __name__ == "__main__":
+    agc = Computer("CSM", "AGC")
+    agc.execute_verb_noun(37, 1)  
\ No newline at end of file
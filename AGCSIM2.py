@@ -1,3 +1,509 @@
+import os  # Already loaded by interpreter startup; heavier modules are imported where used
+
+DIGEST_MASK = 0xFFFFFFFFFFFFFFFF  # 64-bit state digest
+
+
+_list_setitem = list.__setitem__  # Untracked store, used after the page has been flagged
+_KEY_COUNT = 40 * 1024  # Memory locations (38K words) plus register/container slots
+_location_key_table = None
+
+
+def _location_keys():
+    """
+    Per-location odd 64-bit Zobrist keys; a (location, value) pair hashes to
+    (key * value) & DIGEST_MASK, so zero words contribute nothing. Built once,
+    on first use, from a fixed seed so digests agree across processes.
+    """
+    global _location_key_table
+    if _location_key_table is None:
+        import hashlib
+        raw = hashlib.shake_128(b"AGC state digest").digest(8 * _KEY_COUNT)
+        _location_key_table = [int.from_bytes(raw[i:i + 8], "little") | 1 for i in range(0, len(raw), 8)]
+    return _location_key_table
+
+
+class _TrackedMemory(list):
+    """
+    Fixed-size memory list that flags written pages in its owner's page table on
+    item and slice assignment, so direct writes such as agc.erasable_memory[5] = 1
+    are seen by state_digest() and checkpoints. Length-changing operations are
+    not supported.
+    """
+
+    __slots__ = ("owner", "key_base")
+
+    def __init__(self, owner, key_base, words):
+        super().__init__(words)
+        self.owner = owner
+        self.key_base = key_base  # Offset of this list in the digest/page key space
+
+    def __setitem__(self, index, value):
+        flags = self.owner._page_flags
+        if isinstance(index, slice):
+            positions = range(*index.indices(len(self)))
+            values = list(value)
+            if len(values) != len(positions):
+                raise ValueError("Memory slice assignment must not change the memory size")
+            list.__setitem__(self, index, values)
+            for page in {(self.key_base + position) >> AGC.PAGE_SHIFT for position in positions}:
+                flags[page] = AGC.PAGE_DIRTY
+            return
+        if index < 0:
+            index += len(self)
+        list.__setitem__(self, index, value)
+        flags[(self.key_base + index) >> AGC.PAGE_SHIFT] = AGC.PAGE_DIRTY
+
+
+class IOChannel:
+    """
+    Ring-buffered peripheral channel attached to one interface counter.
+    Host code bulk-drains outbound words (written by WRITE, e.g. downlink). The
+    inbound side depends on the mode, which is fixed per channel:
+
+    - WORDS: host bulk-feeds words that READ/RAND latch into the counter one at a time.
+    - COUNTER: host bulk-injects PINC/MINC increments that the run loop applies to
+      the counter, stealing one cycle per increment.
+    """
+
+    WORDS = "words"
+    COUNTER = "counter"
+
+    def __init__(self, capacity=4096, mode=WORDS):
+        if mode not in (self.WORDS, self.COUNTER):
+            raise ValueError(f"Unknown channel mode: {mode}")
+        from collections import deque
+
+        self.capacity = capacity
+        self.mode = mode
+        self.inbound = deque(maxlen=capacity)   # Host -> AGC words (WORDS mode)
+        self.outbound = deque(maxlen=capacity)  # AGC -> host words
+        self.pending_pinc = 0  # PINC increments not yet applied (COUNTER mode)
+        self.pending_minc = 0  # MINC increments not yet applied (COUNTER mode)
+        self.dropped = 0  # Words lost to ring buffer overflow
+
+    def feed(self, words):
+        """Bulk-append inbound words; the oldest words are overwritten on overflow."""
+        if self.mode != self.WORDS:
+            raise ValueError("feed() needs a WORDS channel; use inject_counts() on COUNTER channels")
+        words = words if isinstance(words, (list, tuple)) else list(words)
+        overflow = len(self.inbound) + len(words) - self.capacity
+        if overflow > 0:
+            self.dropped += overflow
+        self.inbound.extend(words)
+        return max(overflow, 0)
+
+    def inject_counts(self, increments):
+        """
+        Queue counter increments: an int (positive = PINC, negative = MINC) or a
+        sequence of signed deltas, summed in bulk without per-delta Python calls.
+        """
+        if self.mode != self.COUNTER:
+            raise ValueError("inject_counts() needs a COUNTER channel; use feed() on WORDS channels")
+        if isinstance(increments, int):
+            net, total = increments, abs(increments)
+        else:
+            net, total = sum(increments), sum(map(abs, increments))
+        self.pending_pinc += (total + net) // 2
+        self.pending_minc += (total - net) // 2
+
+    def emit(self, word):
+        if len(self.outbound) == self.capacity:
+            self.dropped += 1
+        self.outbound.append(word)
+
+    def drain(self, max_words=None):
+        """Remove and return up to max_words outbound words (all if None)."""
+        outbound = self.outbound
+        if max_words is None or max_words >= len(outbound):
+            words = list(outbound)
+            outbound.clear()
+            return words
+        return [outbound.popleft() for _ in range(max_words)]
+
+
+class TelemetryRecorder:
+    """
+    Downlink telemetry stage: samples erasable addresses and registers every
+    `interval` cycles, packs samples into fixed-size binary frames and streams
+    them to a file path, file object or socket from a background writer thread.
+
+    Frame layout (big-endian): FRAME_HEADER_FORMAT (magic, sequence, valid sample count)
+    followed by `samples_per_frame` records of cycle_count (uint64) and one uint16
+    per address/register. Unused records in the final frame are zero-filled.
+
+    If the sink raises, the writer thread records the error and discards the
+    remaining frames; the next sample/flush re-raises it in the simulator thread.
+    """
+
+    PUT_TIMEOUT = 0.1  # Seconds between writer liveness checks while blocked on a full queue
+
+    FRAME_MAGIC = b"AGCT"
+    FRAME_HEADER_FORMAT = ">4sIH"
+
+    def __init__(self, sink, addresses=(), registers=("accumulator", "L", "Q", "program_counter"),
+                 interval=100, samples_per_frame=64, max_pending_frames=64, block=True):
+        self.addresses = tuple(addresses)
+        self.registers = tuple(registers)
+        self.interval = interval
+        self.samples_per_frame = samples_per_frame
+        self.block = block  # Backpressure: True waits for the writer, False drops frames
+        import queue
+        import struct
+        import threading
+
+        self._header = struct.Struct(self.FRAME_HEADER_FORMAT)
+        self.sample_format = struct.Struct(">Q" + "H" * (len(self.addresses) + len(self.registers)))
+        self.frame_size = self._header.size + self.sample_format.size * samples_per_frame
+        self.frames_written = 0
+        self._put_dropped = 0  # Only the simulator thread updates this ...
+        self._writer_dropped = 0  # ... and only the writer thread this, so neither needs a lock
+        self._owns_sink = isinstance(sink, str)
+        self._sink = open(sink, "wb") if self._owns_sink else sink
+        self._write = getattr(self._sink, "sendall", None) or self._sink.write
+        self._queue = queue.Queue(maxsize=max_pending_frames)
+        self._sequence = 0
+        self._next_sample = 0
+        self._error = None  # Exception raised by the sink in the writer thread
+        self._error_reported = False
+        self._closed = False
+        self._new_frame()
+        self._writer = threading.Thread(target=self._writer_loop, name="agc-telemetry", daemon=True)
+        self._writer.start()
+
+    def _new_frame(self):
+        self._frame = bytearray(self.frame_size)
+        self._count = 0
+
+    def __call__(self, agc):
+        """Observer hook for AGC.run(); samples once the next interval boundary is reached."""
+        if self._error is not None:
+            self._raise_error()
+        if agc.cycle_count >= self._next_sample:
+            self.sample(agc)
+            self._next_sample = (agc.cycle_count // self.interval + 1) * self.interval
+
+    @property
+    def frames_dropped(self):
+        """Frames lost to a full queue (block=False) or a failed sink."""
+        return self._put_dropped + self._writer_dropped
+
+    def sample(self, agc):
+        """Append one sample of the configured state to the current frame."""
+        memory = agc.erasable_memory
+        values = [memory[address] & 0xFFFF for address in self.addresses]
+        values.extend(int(getattr(agc, name) or 0) & 0xFFFF for name in self.registers)
+        offset = self._header.size + self._count * self.sample_format.size
+        self.sample_format.pack_into(self._frame, offset, agc.cycle_count & 0xFFFFFFFFFFFFFFFF, *values)
+        self._count += 1
+        if self._count == self.samples_per_frame:
+            self.flush()
+
+    def flush(self):
+        """Queue the current (possibly partial) frame for the writer thread."""
+        if self._error is not None:
+            self._raise_error()
+        if not self._count:
+            return
+        self._header.pack_into(self._frame, 0, self.FRAME_MAGIC, self._sequence, self._count)
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+        frame = bytes(self._frame)
+        self._new_frame()
+        if not self._put(frame, self.block):
+            self._put_dropped += 1
+        if self._error is not None:
+            self._raise_error()
+
+    def _put(self, item, block):
+        """Queue an item without waiting on a dead writer; returns False if it was not queued."""
+        import queue
+
+        if not block:
+            try:
+                self._queue.put_nowait(item)
+                return True
+            except queue.Full:
+                return False
+        while self._writer.is_alive():
+            try:
+                self._queue.put(item, timeout=self.PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _raise_error(self):
+        self._error_reported = True
+        raise self._error
+
+    def _writer_loop(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if self._error is not None:  # Sink failed: discard so producers never block
+                self._writer_dropped += 1
+                continue
+            try:
+                self._write(frame)
+            except Exception as exc:
+                self._error = exc
+                self._writer_dropped += 1
+                continue
+            self.frames_written += 1
+
+    def close(self):
+        """
+        Flush pending samples, stop the writer thread and close an owned sink.
+        Safe to call repeatedly and after a sink failure; a failure not yet
+        reported by sample/flush is raised once cleanup is done.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._error is None:
+                self.flush()
+        finally:
+            self._put(None, block=True)
+            self._writer.join()
+            if self._owns_sink:
+                self._sink.close()
+        if self._error is not None and not self._error_reported:
+            self._raise_error()
+
+    @classmethod
+    def decode_frames(cls, data, n_fields, samples_per_frame):
+        """Yield (sequence, [(cycle, values), ...]) for each frame in a byte string."""
+        import struct
+
+        header = struct.Struct(cls.FRAME_HEADER_FORMAT)
+        sample_format = struct.Struct(">Q" + "H" * n_fields)
+        frame_size = header.size + sample_format.size * samples_per_frame
+        for offset in range(0, len(data) - frame_size + 1, frame_size):
+            magic, sequence, count = header.unpack_from(data, offset)
+            if magic != cls.FRAME_MAGIC:
+                raise ValueError(f"Bad telemetry frame at offset {offset}")
+            base = offset + header.size
+            samples = []
+            for i in range(count):
+                cycle, *values = sample_format.unpack_from(data, base + i * sample_format.size)
+                samples.append((cycle, values))
+            yield sequence, samples
+
+
+class Checkpointer:
+    """
+    Periodic checkpointing for AGC.run(): every `interval` cycles writes a
+    compressed snapshot of the state under `directory`. Snapshots hold only the
+    memory pages dirtied since the previous one; every `full_every`-th snapshot
+    is a full one so restore chains stay short. Runs are assumed deterministic
+    (host-fed IOChannel traffic is not replayed).
+
+    Each run writes into its own `run-NNNNNN` subdirectory, and every incremental
+    snapshot names its parent, so restores never mix snapshots from different
+    runs. After a restore, checkpointing continues in a fresh run.
+
+    Snapshots are JSON inside a zlib stream (never pickle, so loading a
+    checkpoint cannot execute code) named SEQUENCE-CYCLE-KIND, so two snapshots
+    taken at the same cycle never overwrite each other.
+    """
+
+    SUFFIX = ".ckpt"
+    RUN_PREFIX = "run-"
+
+    def __init__(self, directory, interval=100000, full_every=16):
+        self.directory = directory
+        self.interval = interval
+        self.full_every = full_every
+        self.run = None  # Run subdirectory being recorded or restored from
+        self._fork = False  # Set by restore(): the next checkpoint starts a new run
+        self._since_full = None  # None until the first (full) checkpoint of the run is taken
+        self._last_id = None  # Parent of the next incremental checkpoint
+        self._sequence = 0  # Number of the next checkpoint within the run
+        self._next_checkpoint = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def __call__(self, agc):
+        """Observer hook for AGC.run(); checkpoints once the next interval boundary is reached."""
+        if agc.cycle_count >= self._next_checkpoint:
+            self.checkpoint(agc)
+            self._next_checkpoint = (agc.cycle_count // self.interval + 1) * self.interval
+
+    def runs(self):
+        """Return run subdirectory names, oldest first."""
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.startswith(self.RUN_PREFIX) and os.path.isdir(os.path.join(self.directory, name)))
+
+    def _start_run(self):
+        runs = self.runs()
+        number = int(runs[-1][len(self.RUN_PREFIX):]) + 1 if runs else 1
+        while True:
+            name = f"{self.RUN_PREFIX}{number:06d}"
+            try:
+                os.mkdir(os.path.join(self.directory, name))
+            except FileExistsError:  # Another checkpointer claimed it
+                number += 1
+                continue
+            _fsync_directory(self.directory)
+            return name
+
+    def checkpoint(self, agc, full=None):
+        """Write a checkpoint now; full defaults to the full_every schedule (always full for a new run)."""
+        if self.run is None or self._fork:
+            self.run = self._start_run()
+            self._fork = False
+            self._last_id = None
+            self._sequence = 0
+        if self._last_id is None:
+            full = True  # Every run starts with a full snapshot
+        elif full is None:
+            full = self._since_full + 1 >= self.full_every
+        state = agc.checkpoint_state(full=full)
+        state["parent"] = None if full else self._last_id
+        self._since_full = 0 if full else self._since_full + 1
+        import json
+        import zlib
+
+        checkpoint_id = f"{self._sequence:06d}-{state['cycle']:016d}-{'full' if full else 'incr'}"
+        run_directory = os.path.join(self.directory, self.run)
+        path = os.path.join(run_directory, checkpoint_id + self.SUFFIX)
+        with open(path + ".tmp", "wb") as f:
+            f.write(zlib.compress(json.dumps(state, separators=(",", ":")).encode()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)  # Never leave a torn checkpoint behind
+        _fsync_directory(run_directory)
+        self._last_id = checkpoint_id
+        self._sequence += 1
+        return path
+
+    def checkpoints(self, run=None):
+        """Return [(cycle, full, path), ...] for `run` (this run, else the latest one), in the order written."""
+        run = run or self.run or self._latest_run()
+        if run is None:
+            return []
+        run_directory = os.path.join(self.directory, run)
+        entries = []
+        for name in os.listdir(run_directory):
+            if name.endswith(self.SUFFIX):
+                sequence, cycle, kind = name[:-len(self.SUFFIX)].split("-")
+                entries.append((int(sequence), int(cycle), kind == "full", os.path.join(run_directory, name)))
+        return [entry[1:] for entry in sorted(entries)]
+
+    def _latest_run(self):
+        for run in reversed(self.runs()):
+            if any(name.endswith(self.SUFFIX) for name in os.listdir(os.path.join(self.directory, run))):
+                return run
+        return None
+
+    def _load(self, path):
+        import json
+        import zlib
+
+        with open(path, "rb") as f:
+            checkpoint = json.loads(zlib.decompress(f.read()))
+        # JSON turns page numbers into strings and interrupt tuples into lists
+        checkpoint["pages"] = {int(page): chunk for page, chunk in checkpoint["pages"].items()}
+        fields = checkpoint["fields"]
+        fields["interrupt_pending"] = [tuple(interrupt) for interrupt in fields["interrupt_pending"]]
+        return checkpoint
+
+    def restore(self, cycle=None, agc=None, run=None):
+        """
+        Restore the latest checkpoint at or before `cycle` (latest overall if None)
+        from `run` (this run, else the latest one) into `agc` (a new AGC if None)
+        and return it. The chain is rebuilt by following parent links back to a
+        full snapshot.
+        """
+        entries = [e for e in self.checkpoints(run) if cycle is None or e[0] <= cycle]
+        if not entries:
+            raise ValueError(f"No checkpoint at or before cycle {cycle}")
+        paths = {os.path.basename(path)[:-len(self.SUFFIX)]: path for _, _, path in entries}
+        chain = [self._load(entries[-1][2])]
+        visited = {os.path.basename(entries[-1][2])[:-len(self.SUFFIX)]}
+        while not chain[-1]["full"]:
+            parent = chain[-1]["parent"]
+            if parent not in paths:
+                raise ValueError(f"Checkpoint chain broken: parent {parent} missing")
+            if parent in visited:
+                raise ValueError(f"Checkpoint chain broken: cycle through {parent}")
+            visited.add(parent)
+            chain.append(self._load(paths[parent]))
+        agc = agc if agc is not None else AGC()
+        for checkpoint in reversed(chain):
+            agc.restore_state(checkpoint)
+        # The restored timeline may diverge from what was recorded; keep reading this run
+        # but write further checkpoints into a new one
+        self.run = (self.run or self._latest_run()) if run is None else run
+        self._fork = True
+        self._last_id = None
+        self._next_checkpoint = (agc.cycle_count // self.interval + 1) * self.interval
+        return agc
+
+    def resume(self, agc=None):
+        """Restore the latest checkpoint so the run can continue under this checkpointer."""
+        return self.restore(agc=agc)
+
+    def seek(self, cycle, agc=None):
+        """Restore the nearest checkpoint and replay forward to the first instruction boundary at or after `cycle`."""
+        agc = self.restore(cycle, agc)
+        if agc.cycle_count < cycle:
+            agc.run(cycle - agc.cycle_count)
+        return agc
+
+
+def _fsync_directory(path):
+    """Persist directory entries (renames, new files) where the platform allows it."""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CPUState:
+    """Register, bank, timer and flag state of the AGC; slotted so instruction handlers avoid dict lookups."""
+
+    __slots__ = (
+        "L", "Q", "accumulator", "program_counter", "extended_mode", "extended_address",
+        "fixed_bank", "erase_bank", "interrupt_enabled", "interrupt_active", "interrupt_return",
+        "time1", "time3", "cycle_count", "parity_fail",
+    )
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Reinitialise every field in place (holders of this object see the reset)."""
+        self.L = 0              # L register (low word for double-precision)
+        self.Q = 0              # Q register (return address)
+        self.accumulator = 0    # Accumulator (A register)
+        self.program_counter = 0  # Z register
+        self.extended_mode = False
+        self.extended_address = None
+        self.fixed_bank = 0  # Current fixed memory bank (0-35)
+        self.erase_bank = 0  # Current erasable memory bank (0-7)
+        self.interrupt_enabled = True
+        self.interrupt_active = False
+        self.interrupt_return = 0
+        self.time1 = 0  # TIME1 counter (10ms increments)
+        self.time3 = 0  # TIME3 counter (overflow triggers T3RUPT)
+        self.cycle_count = 0  # For cycle-accurate simulation
+        self.parity_fail = False  # Parity error flag
+
+
+def _state_property(name):
+    """AGC attribute forwarding to the slotted CPUState (keeps agc.accumulator etc. working)."""
+    def fget(self):
+        return getattr(self.state, name)
+
+    def fset(self, value):
+        setattr(self.state, name, value)
+    return property(fget, fset, doc=f"CPUState.{name}")
+
+
 class AGC:
     """
     Enhanced Block II Apollo Guidance Computer simulation.
@@ -5,6 +511,30 @@ class AGC:
     DSKY interface, instruction decoding, and fault handling.
     """
 
+    # No per-instance __dict__; registers/timers live in the slotted CPUState
+    __slots__ = (
+        "_memory", "_erasable_memory", "_memory_digest", "_page_digests", "_page_flags", "state",
+        "interrupt_pending", "dsky_verb", "dsky_noun", "dsky_buffer", "dsky_display",
+        "interface_counters", "channels", "_dispatch", "__weakref__",
+    )
+
+    # Register/timer attributes forward to self.state
+    L = _state_property("L")
+    Q = _state_property("Q")
+    accumulator = _state_property("accumulator")
+    program_counter = _state_property("program_counter")
+    extended_mode = _state_property("extended_mode")
+    extended_address = _state_property("extended_address")
+    fixed_bank = _state_property("fixed_bank")
+    erase_bank = _state_property("erase_bank")
+    interrupt_enabled = _state_property("interrupt_enabled")
+    interrupt_active = _state_property("interrupt_active")
+    interrupt_return = _state_property("interrupt_return")
+    time1 = _state_property("time1")
+    time3 = _state_property("time3")
+    cycle_count = _state_property("cycle_count")
+    parity_fail = _state_property("parity_fail")
+
     # AGC constants
     FIXED_SIZE = 36864      # ROM (36K words, 15 bits each)
     ERASE_SIZE = 2048       # RAM
@@ -24,31 +554,106 @@ class AGC:
         "KEYRUPT": 0x4014   # Keyboard interrupt
     }
 
+    # Opcode -> handler method name; resolved to functions once per class by _dispatch_table()
+    INSTRUCTION_HANDLERS = {
+        0o00: "tc",      # TC (Transfer Control)
+        0o01: "ccs",     # CCS (Count, Compare, Skip)
+        0o02: "index",   # INDEX
+        0o03: "xch",     # XCH (Exchange)
+        0o04: "ca",      # CA (Clear and Add)
+        0o05: "cs",      # CS (Clear and Subtract)
+        0o06: "ts",      # TS (Transfer to Storage)
+        0o07: "ad",      # AD (Add)
+        0o10: "msk",     # MASK
+        0o11: "extend",  # EXTEND
+        0o12: "mp",      # MP (Multiply, extended)
+        0o13: "dv",      # DV (Divide, extended)
+        0o14: "su",      # SU (Subtract, extended)
+        0o15: "dca",     # DCA (Double Clear and Add)
+        0o16: "dcs",     # DCS (Double Clear and Subtract)
+        0o17: "dad",     # DAD (Double Add)
+        0o20: "dsu",     # DSU (Double Subtract)
+        0o21: "das",     # DAS (Double Add and Store)
+        0o22: "lxch",    # LXCH (Exchange L)
+        0o23: "qxch",    # QXCH (Exchange Q)
+        0o24: "incr",    # INCR (Increment)
+        0o25: "aug",     # AUG (Augment)
+        0o26: "dim",     # DIM (Diminish)
+        0o27: "bzf",     # BZF (Branch Zero or Positive)
+        0o30: "bzm",     # BZM (Branch Zero or Minus)
+        0o31: "relint",  # RELINT (Release Interrupt)
+        0o32: "inhint",  # INHINT (Inhibit Interrupt)
+        0o33: "edrupt",  # EDRUPT (Enable Disrupt)
+        0o34: "resume",  # RESUME
+        0o35: "cyr",     # CYR (Cycle Right)
+        0o36: "sr",      # SR (Shift Right)
+        0o37: "sl",      # SL (Shift Left)
+        0o40: "pinc",    # PINC (Positive Increment)
+        0o41: "minc",    # MINC (Minus Increment)
+        0o42: "dxch",    # DXCH (Double Exchange)
+        0o43: "caf",     # CAF (Clear and Add Fixed)
+        0o44: "tcaf",    # TCAF (Transfer Control and Add Fixed)
+        0o45: "rand",    # RAND (Read and Clear)
+        0o46: "mask",    # MASK
+        0o47: "read",    # READ
+        0o50: "write",   # WRITE
+        0o51: "noop",    # NOOP
+    }
+
+    # Mnemonic -> opcode, used by execute_instruction_list()
+    OPCODE_MAP = {
+        "TC": 0o00, "CCS": 0o01, "INDEX": 0o02, "XCH": 0o03, "CA": 0o04,
+        "CS": 0o05, "TS": 0o06, "AD": 0o07, "MSK": 0o10, "EXTEND": 0o11,
+        "MP": 0o12, "DV": 0o13, "SU": 0o14, "DCA": 0o15, "DCS": 0o16,
+        "DAD": 0o17, "DSU": 0o20, "DAS": 0o21, "LXCH": 0o22, "QXCH": 0o23,
+        "INCR": 0o24, "AUG": 0o25, "DIM": 0o26, "BZF": 0o27, "BZM": 0o30,
+        "RELINT": 0o31, "INHINT": 0o32, "EDRUPT": 0o33, "RESUME": 0o34,
+        "CYR": 0o35, "SR": 0o36, "SL": 0o37, "PINC": 0o40, "MINC": 0o41,
+        "DXCH": 0o42, "CAF": 0o43, "TCAF": 0o44, "RAND": 0o45, "MASK": 0o46,
+        "READ": 0o47, "WRITE": 0o50, "NOOP": 0o51
+    }
+
+    # Checkpoint/digest pages: 256 words over fixed memory followed by erasable memory
+    PAGE_SHIFT = 8
+    PAGE_SIZE = 1 << PAGE_SHIFT
+    PAGE_COUNT = (FIXED_SIZE + ERASE_SIZE) >> PAGE_SHIFT
+    PAGE_CHECKPOINT = 1  # Page flag: written since the last checkpoint
+    PAGE_DIGEST = 2      # Page flag: written since its digest was last computed
+    PAGE_DIRTY = PAGE_CHECKPOINT | PAGE_DIGEST
+
+    # Non-memory state captured by checkpoint_state(); attached IOChannels are host objects and are not saved
+    CHECKPOINT_FIELDS = (
+        "fixed_bank", "erase_bank", "L", "Q", "accumulator", "program_counter",
+        "extended_mode", "extended_address", "interrupt_enabled", "interrupt_pending",
+        "interrupt_active", "interrupt_return", "time1", "time3", "cycle_count",
+        "dsky_verb", "dsky_noun", "dsky_buffer", "dsky_display", "interface_counters",
+        "parity_fail",
+    )
+
+    # Register state folded into state_digest()
+    DIGEST_REGISTERS = (
+        "L", "Q", "accumulator", "program_counter", "fixed_bank", "erase_bank",
+        "extended_mode", "interrupt_enabled", "interrupt_active", "interrupt_return",
+        "time1", "time3", "cycle_count", "parity_fail", "extended_address",
+        "dsky_verb", "dsky_noun",
+    )
+
+    # Small containers folded into state_digest() at query time
+    DIGEST_CONTAINERS = ("interrupt_pending", "interface_counters", "dsky_buffer", "dsky_display")
+
     def __init__(self):
         # Memory
-        self.memory = [0] * self.FIXED_SIZE  # Fixed memory (ROM)
-        self.erasable_memory = [0] * self.ERASE_SIZE  # Erasable memory (RAM)
-        self.fixed_bank = 0  # Current fixed memory bank (0-35)
-        self.erase_bank = 0  # Current erasable memory bank (0-7)
+        self._memory = None  # Fixed memory (ROM), allocated on first access
+        self._erasable_memory = None  # Erasable memory (RAM), allocated on first access
+        self._page_flags = bytearray(self.PAGE_COUNT)  # PAGE_* bits per page; a write sets PAGE_DIRTY
+        self._page_digests = None  # Per-page digests (None while all memory is zero)
+        self._memory_digest = 0  # XOR of _page_digests
 
-        # Registers
-        self.L = 0              # L register (low word for double-precision)
-        self.Q = 0              # Q register (return address)
-        self.accumulator = 0    # Accumulator (A register)
-        self.program_counter = 0  # Z register
-        self.extended_mode = False
-        self.extended_address = None
+        # Registers, banks, timers and flags (also exposed as AGC attributes)
+        self.state = CPUState()
 
         # Interrupt handling
-        self.interrupt_enabled = True
         self.interrupt_pending = []  # List of pending interrupts (type, priority)
-        self.interrupt_active = False
-        self.interrupt_return = 0
-
-        # Timers
-        self.time1 = 0  # TIME1 counter (10ms increments)
-        self.time3 = 0  # TIME3 counter (overflow triggers T3RUPT)
-        self.cycle_count = 0  # For cycle-accurate simulation
 
         # DSKY
         self.dsky_verb = 0
@@ -58,53 +663,53 @@ class AGC:
 
         # Interface counters
         self.interface_counters = [0] * 16  # 16 I/O channels
-        self.parity_fail = False  # Parity error flag
-
-        # Instruction set mapping
-        self.instruction_set = {
-            0o00: self.tc,    # TC (Transfer Control)
-            0o01: self.ccs,   # CCS (Count, Compare, Skip)
-            0o02: self.index, # INDEX
-            0o03: self.xch,   # XCH (Exchange)
-            0o04: self.ca,    # CA (Clear and Add)
-            0o05: self.cs,    # CS (Clear and Subtract)
-            0o06: self.ts,    # TS (Transfer to Storage)
-            0o07: self.ad,    # AD (Add)
-            0o10: self.msk,   # MASK
-            0o11: self.extend,# EXTEND
-            0o12: self.mp,    # MP (Multiply, extended)
-            0o13: self.dv,    # DV (Divide, extended)
-            0o14: self.su,    # SU (Subtract, extended)
-            0o15: self.dca,   # DCA (Double Clear and Add)
-            0o16: self.dcs,   # DCS (Double Clear and Subtract)
-            0o17: self.dad,   # DAD (Double Add)
-            0o20: self.dsu,   # DSU (Double Subtract)
-            0o21: self.das,   # DAS (Double Add and Store)
-            0o22: self.lxch,  # LXCH (Exchange L)
-            0o23: self.qxch,  # QXCH (Exchange Q)
-            0o24: self.incr,  # INCR (Increment)
-            0o25: self.aug,   # AUG (Augment)
-            0o26: self.dim,   # DIM (Diminish)
-            0o27: self.bzf,   # BZF (Branch Zero or Positive)
-            0o30: self.bzm,   # BZM (Branch Zero or Minus)
-            0o31: self.relint,# RELINT (Release Interrupt)
-            0o32: self.inhint,# INHINT (Inhibit Interrupt)
-            0o33: self.edrupt,# EDRUPT (Enable Disrupt)
-            0o34: self.resume,# RESUME
-            0o35: self.cyr,   # CYR (Cycle Right)
-            0o36: self.sr,    # SR (Shift Right)
-            0o37: self.sl,    # SL (Shift Left)
-            0o40: self.pinc,  # PINC (Positive Increment)
-            0o41: self.minc,  # MINC (Minus Increment)
-            0o42: self.dxch,  # DXCH (Double Exchange)
-            0o43: self.caf,   # CAF (Clear and Add Fixed)
-            0o44: self.tcaf,  # TCAF (Transfer Control and Add Fixed)
-            0o45: self.rand,  # RAND (Read and Clear)
-            0o46: self.mask,  # MASK
-            0o47: self.read,  # READ
-            0o50: self.write,  # WRITE
-            0o51: self.noop,  # NOOP
-        }
+        self.channels = {}  # Counter index -> attached IOChannel
+
+        self._dispatch = self._dispatch_table()  # Shared per-class opcode table
+
+    @classmethod
+    def _dispatch_table(cls):
+        """Build the opcode -> function table once per class (subclass overrides are honoured)."""
+        table = cls.__dict__.get("_class_dispatch")
+        if table is None:
+            table = {opcode: getattr(cls, name) for opcode, name in cls.INSTRUCTION_HANDLERS.items()}
+            cls._class_dispatch = table
+        return table
+
+    @property
+    def instruction_set(self):
+        """
+        Read-only opcode -> bound handler view. Dispatch uses the per-class table,
+        so replace handlers by overriding methods in a subclass.
+        """
+        import types
+
+        return types.MappingProxyType(
+            {opcode: getattr(self, name) for opcode, name in self.INSTRUCTION_HANDLERS.items()})
+
+    # --- Lazily Allocated Memory ---
+    @property
+    def memory(self):
+        if self._memory is None:
+            self._memory = _TrackedMemory(self, 0, [0] * self.FIXED_SIZE)
+        return self._memory
+
+    @memory.setter
+    def memory(self, words):
+        self._memory = _TrackedMemory(self, 0, words)
+        self._page_flags[:self.FIXED_SIZE >> self.PAGE_SHIFT] = bytes([self.PAGE_DIRTY]) * (self.FIXED_SIZE >> self.PAGE_SHIFT)
+
+    @property
+    def erasable_memory(self):
+        if self._erasable_memory is None:
+            self._erasable_memory = _TrackedMemory(self, self.FIXED_SIZE, [0] * self.ERASE_SIZE)
+        return self._erasable_memory
+
+    @erasable_memory.setter
+    def erasable_memory(self, words):
+        self._erasable_memory = _TrackedMemory(self, self.FIXED_SIZE, words)
+        first = self.FIXED_SIZE >> self.PAGE_SHIFT
+        self._page_flags[first:] = bytes([self.PAGE_DIRTY]) * (self.PAGE_COUNT - first)
 
     # --- Utility Functions ---
     def agc_word(self, value):
@@ -145,182 +750,328 @@ class AGC:
 
     def get_memory(self, address, is_fixed=False):
         """Access memory with banking."""
+        state = self.state
         if is_fixed:
             if address >= self.FIXED_SIZE:
-                self.parity_fail = True
+                state.parity_fail = True
                 return 0
-            bank_offset = self.fixed_bank * self.BANK_SIZE
-            return self.memory[(bank_offset + address) % self.FIXED_SIZE]
+            if self._memory is None:  # Untouched ROM reads as zero
+                return 0
+            bank_offset = state.fixed_bank * self.BANK_SIZE
+            return self._memory[(bank_offset + address) % self.FIXED_SIZE]
         else:
             if address >= self.ERASE_SIZE:
-                self.parity_fail = True
+                state.parity_fail = True
+                return 0
+            if self._erasable_memory is None:
                 return 0
-            bank_offset = self.erase_bank * 256  # 256 words per erasable bank
-            return self.erasable_memory[(bank_offset + address) % self.ERASE_SIZE]
+            bank_offset = state.erase_bank * 256  # 256 words per erasable bank
+            return self._erasable_memory[(bank_offset + address) % self.ERASE_SIZE]
 
     def set_memory(self, address, value, is_fixed=False):
         """Write to memory with banking."""
+        state = self.state
         value = self.agc_word(value)
         if is_fixed:
-            if address < self.FIXED_SIZE:
-                bank_offset = self.fixed_bank * self.BANK_SIZE
-                self.memory[(bank_offset + address) % self.FIXED_SIZE] = value
+            if address >= self.FIXED_SIZE:
+                return
+            words = self._memory if self._memory is not None else self.memory
+            index = (state.fixed_bank * self.BANK_SIZE + address) % self.FIXED_SIZE
+            key_index = index
         else:
-            if address < self.ERASE_SIZE:
-                bank_offset = self.erase_bank * 256
-                self.erasable_memory[(bank_offset + address) % self.ERASE_SIZE] = value
+            if address >= self.ERASE_SIZE:
+                return
+            words = self._erasable_memory if self._erasable_memory is not None else self.erasable_memory
+            index = (state.erase_bank * 256 + address) % self.ERASE_SIZE
+            key_index = self.FIXED_SIZE + index
+        # Same bookkeeping as _TrackedMemory.__setitem__, inlined for the instruction hot path
+        _list_setitem(words, index, value)
+        self._page_flags[key_index >> 8] = 3  # PAGE_DIRTY of page key_index >> PAGE_SHIFT
         if not self.check_parity(value):
-            self.parity_fail = True
+            state.parity_fail = True
+
+    # --- State Digest ---
+    def _sync_digest(self):
+        """Re-digest the pages written since the last query and fold them into _memory_digest."""
+        flags = self._page_flags
+        stale = [page for page, flag in enumerate(flags) if flag & self.PAGE_DIGEST]
+        if not stale:
+            return self._memory_digest
+        if self._page_digests is None:
+            self._page_digests = [0] * self.PAGE_COUNT
+        keys = _location_keys()
+        digest = self._memory_digest
+        for page in stale:
+            words, start = self._page_words(page)
+            page_digest = 0
+            if words is not None:
+                base = page << self.PAGE_SHIFT
+                for offset, value in enumerate(words[start:start + self.PAGE_SIZE]):
+                    if value:
+                        page_digest ^= keys[base + offset] * value
+                page_digest &= DIGEST_MASK
+            digest ^= self._page_digests[page] ^ page_digest
+            self._page_digests[page] = page_digest
+            flags[page] &= ~self.PAGE_DIGEST
+        self._memory_digest = digest
+        return digest
+
+    def rehash(self):
+        """Recompute the memory digest from scratch (normally only written pages are re-digested)."""
+        self._page_digests = None
+        self._memory_digest = 0
+        for page in range(self.PAGE_COUNT):
+            self._page_flags[page] |= self.PAGE_DIGEST
+        return self._sync_digest()
+
+    def state_digest(self):
+        """
+        64-bit digest of memory, registers and the small queues/displays. Writes
+        only flag their page; a query re-digests just the pages written since the
+        previous query, and folds in the rest of the state.
+        """
+        import zlib
+
+        keys = _location_keys()
+        digest = self._sync_digest()
+        base = self.FIXED_SIZE + self.ERASE_SIZE
+        for i, name in enumerate(self.DIGEST_REGISTERS):
+            value = getattr(self, name)
+            digest ^= keys[base + i] * (int(value) if value is not None else 0)
+        base += len(self.DIGEST_REGISTERS)
+        for i, name in enumerate(self.DIGEST_CONTAINERS):
+            # repr + crc32 is stable across processes, unlike hash() of str
+            digest ^= keys[base + i] * (zlib.crc32(repr(getattr(self, name)).encode()) + 1)
+        return digest & DIGEST_MASK
+
+    def same_state(self, other):
+        """Digest equality check against another AGC (or a digest obtained from state_digest())."""
+        other_digest = other if isinstance(other, int) else other.state_digest()
+        return self.state_digest() == other_digest
+
+    # --- Checkpoints ---
+    def _page_words(self, page):
+        """Return (memory list, start index) for a checkpoint page, or None if unallocated."""
+        start = page << self.PAGE_SHIFT
+        if start < self.FIXED_SIZE:
+            return self._memory, start
+        return self._erasable_memory, start - self.FIXED_SIZE
+
+    def checkpoint_state(self, full=False):
+        """
+        Capture registers plus memory pages written since the previous checkpoint
+        (every non-zero page if full). Clears the pages' PAGE_CHECKPOINT flags.
+        """
+        flags = self._page_flags
+        if full:
+            pages = range(self.PAGE_COUNT)
+        else:
+            pages = [page for page, flag in enumerate(flags) if flag & self.PAGE_CHECKPOINT]
+        saved = {}
+        for page in pages:
+            words, start = self._page_words(page)
+            if words is None:
+                continue
+            chunk = words[start:start + self.PAGE_SIZE]
+            if full and not any(chunk):
+                continue
+            saved[page] = chunk
+        for page in range(self.PAGE_COUNT):
+            flags[page] &= ~self.PAGE_CHECKPOINT
+        fields = {name: getattr(self, name) for name in self.CHECKPOINT_FIELDS}
+        for name in ("interrupt_pending", "dsky_buffer", "dsky_display", "interface_counters"):
+            fields[name] = list(fields[name])
+        return {"cycle": self.cycle_count, "full": full, "fields": fields, "pages": saved}
+
+    def restore_state(self, checkpoint):
+        """Apply a checkpoint from checkpoint_state(); incremental ones must be applied in order after a full one."""
+        if checkpoint["full"]:
+            self._memory = None
+            self._erasable_memory = None
+            self._page_digests = None  # Memory is all zero again until pages are applied
+            self._memory_digest = 0
+            self._page_flags = bytearray(self.PAGE_COUNT)
+        for page, chunk in checkpoint["pages"].items():
+            if page << self.PAGE_SHIFT < self.FIXED_SIZE:
+                words, start = self.memory, page << self.PAGE_SHIFT
+            else:
+                words, start = self.erasable_memory, (page << self.PAGE_SHIFT) - self.FIXED_SIZE
+            words[start:start + len(chunk)] = chunk
+        for name, value in checkpoint["fields"].items():
+            setattr(self, name, list(value) if isinstance(value, list) else value)
+        for page in range(self.PAGE_COUNT):
+            self._page_flags[page] &= ~self.PAGE_CHECKPOINT
 
     # --- Instruction Implementations ---
     def tc(self, address):
-        self.program_counter = address
-        self.cycle_count += 1
+        state = self.state
+        state.program_counter = address
+        state.cycle_count += 1
 
     def ccs(self, address):
+        state = self.state
         value = self.get_memory(address)
         if self.agc_is_zero(value):
-            self.program_counter = self.agc_add(self.program_counter, 1)
+            state.program_counter = self.agc_add(state.program_counter, 1)
         elif not self.agc_is_negative(value):
-            self.accumulator = self.agc_complement(self.accumulator)
+            state.accumulator = self.agc_complement(state.accumulator)
         else:
-            self.accumulator &= ~self.SIGN_BIT
-        self.cycle_count += 2
+            state.accumulator &= ~self.SIGN_BIT
+        state.cycle_count += 2
 
     def index(self, address):
-        self.program_counter = self.get_memory(address)
-        self.cycle_count += 1
+        state = self.state
+        state.program_counter = self.get_memory(address)
+        state.cycle_count += 1
 
     def xch(self, address):
-        temp = self.accumulator
-        self.accumulator = self.get_memory(address)
+        state = self.state
+        temp = state.accumulator
+        state.accumulator = self.get_memory(address)
         self.set_memory(address, temp)
-        self.cycle_count += 2
+        state.cycle_count += 2
 
     def ca(self, address):
-        self.accumulator = self.get_memory(address)
-        self.cycle_count += 2
+        state = self.state
+        state.accumulator = self.get_memory(address)
+        state.cycle_count += 2
 
     def cs(self, address):
-        self.accumulator = self.agc_complement(self.get_memory(address))
-        self.cycle_count += 2
+        state = self.state
+        state.accumulator = self.agc_complement(self.get_memory(address))
+        state.cycle_count += 2
 
     def ts(self, address):
-        self.set_memory(address, self.accumulator)
-        self.accumulator = 0
-        self.cycle_count += 2
+        state = self.state
+        self.set_memory(address, state.accumulator)
+        state.accumulator = 0
+        state.cycle_count += 2
 
     def ad(self, address):
-        self.accumulator = self.agc_add(self.accumulator, self.get_memory(address))
-        self.cycle_count += 2
+        state = self.state
+        state.accumulator = self.agc_add(state.accumulator, self.get_memory(address))
+        state.cycle_count += 2
 
     def msk(self, mask):
-        self.accumulator &= mask & self.WORD_MASK
-        self.cycle_count += 1
+        state = self.state
+        state.accumulator &= mask & self.WORD_MASK
+        state.cycle_count += 1
 
     def extend(self, address=None):
-        self.extended_mode = True
-        self.extended_address = address
-        self.cycle_count += 1
+        state = self.state
+        state.extended_mode = True
+        state.extended_address = address
+        state.cycle_count += 1
 
     def mp(self, address):
-        a = self.accumulator
+        state = self.state
+        a = state.accumulator
         b = self.get_memory(address)
         product = a * b
-        self.L = (product >> 15) & self.WORD_MASK
-        self.accumulator = product & self.WORD_MASK
-        self.cycle_count += 6
+        state.L = (product >> 15) & self.WORD_MASK
+        state.accumulator = product & self.WORD_MASK
+        state.cycle_count += 6
 
     def dv(self, address):
-        dividend = (self.L << 15) | self.accumulator
+        state = self.state
+        dividend = (state.L << 15) | state.accumulator
         divisor = self.get_memory(address)
         if divisor == 0:
-            self.accumulator = 0
-            self.L = 0
+            state.accumulator = 0
+            state.L = 0
             self.interrupt_pending.append(("DSRUPT", 2))
-            self.cycle_count += 6
+            state.cycle_count += 6
             return
         quotient = dividend // divisor
         remainder = dividend % divisor
-        self.accumulator = quotient & self.WORD_MASK
-        self.L = remainder & self.WORD_MASK
-        self.cycle_count += 6
+        state.accumulator = quotient & self.WORD_MASK
+        state.L = remainder & self.WORD_MASK
+        state.cycle_count += 6
 
     def su(self, address):
-        self.accumulator = self.agc_sub(self.accumulator, self.get_memory(address))
-        self.cycle_count += 2
+        state = self.state
+        state.accumulator = self.agc_sub(state.accumulator, self.get_memory(address))
+        state.cycle_count += 2
 
     def dca(self, address):
-        self.accumulator = self.agc_word(self.get_memory(address))
-        self.L = self.agc_word(self.get_memory((address + 1) % self.ERASE_SIZE))
-        self.cycle_count += 4
+        state = self.state
+        state.accumulator = self.agc_word(self.get_memory(address))
+        state.L = self.agc_word(self.get_memory((address + 1) % self.ERASE_SIZE))
+        state.cycle_count += 4
 
     def dcs(self, address):
-        self.accumulator = self.agc_complement(self.get_memory(address))
-        self.L = self.agc_complement(self.get_memory((address + 1) % self.ERASE_SIZE))
-        self.cycle_count += 4
+        state = self.state
+        state.accumulator = self.agc_complement(self.get_memory(address))
+        state.L = self.agc_complement(self.get_memory((address + 1) % self.ERASE_SIZE))
+        state.cycle_count += 4
 
     def dad(self, address):
-        a = self.accumulator
+        state = self.state
+        a = state.accumulator
         b = self.get_memory(address)
         sum_low_raw = a + b
         sum_low = self.agc_add(a, b)
         carry = 1 if sum_low_raw > self.WORD_MASK else 0
-        l = self.L
+        l = state.L
         b2 = self.get_memory((address + 1) % self.ERASE_SIZE)
         sum_high = self.agc_add(l, b2)
         sum_high = self.agc_add(sum_high, carry)
-        self.accumulator = sum_low & self.WORD_MASK
-        self.L = sum_high & self.WORD_MASK
-        self.cycle_count += 6
+        state.accumulator = sum_low & self.WORD_MASK
+        state.L = sum_high & self.WORD_MASK
+        state.cycle_count += 6
 
     def dsu(self, address):
-        a = self.accumulator
+        state = self.state
+        a = state.accumulator
         b = self.get_memory(address)
         diff_low_raw = a - b
         diff_low = self.agc_sub(a, b)
         borrow = 1 if diff_low_raw < 0 else 0
-        l = self.L
+        l = state.L
         b2 = self.get_memory((address + 1) % self.ERASE_SIZE)
         diff_high = self.agc_sub(l, b2)
         diff_high = self.agc_sub(diff_high, borrow)
-        self.accumulator = diff_low & self.WORD_MASK
-        self.L = diff_high & self.WORD_MASK
-        self.cycle_count += 6
+        state.accumulator = diff_low & self.WORD_MASK
+        state.L = diff_high & self.WORD_MASK
+        state.cycle_count += 6
 
     def das(self, address):
-        a = self.accumulator
+        state = self.state
+        a = state.accumulator
         b = self.get_memory(address)
         sum_low_raw = a + b
         sum_low = self.agc_add(a, b)
         carry = 1 if sum_low_raw > self.WORD_MASK else 0
-        l = self.L
+        l = state.L
         b2 = self.get_memory((address + 1) % self.ERASE_SIZE)
         sum_high = self.agc_add(l, b2)
         sum_high = self.agc_add(sum_high, carry)
         self.set_memory(address, sum_low)
         self.set_memory((address + 1) % self.ERASE_SIZE, sum_high)
-        self.cycle_count += 6
+        state.cycle_count += 6
 
     def lxch(self, address):
-        temp = self.L
-        self.L = self.get_memory(address)
+        state = self.state
+        temp = state.L
+        state.L = self.get_memory(address)
         self.set_memory(address, temp)
-        self.cycle_count += 2
+        state.cycle_count += 2
 
     def qxch(self, address):
-        temp = self.Q
-        self.Q = self.get_memory(address)
+        state = self.state
+        temp = state.Q
+        state.Q = self.get_memory(address)
         self.set_memory(address, temp)
-        self.cycle_count += 2
+        state.cycle_count += 2
 
     def incr(self, address):
         self.set_memory(address, self.agc_add(self.get_memory(address), 1))
-        self.cycle_count += 2
+        self.state.cycle_count += 2
 
     def aug(self):
-        self.accumulator = self.agc_add(self.accumulator, 1)
-        self.cycle_count += 1
+        state = self.state
+        state.accumulator = self.agc_add(state.accumulator, 1)
+        state.cycle_count += 1
 
     def dim(self, address):
         value = self.get_memory(address)
@@ -328,125 +1079,139 @@ class AGC:
             self.set_memory(address, self.agc_sub(value, 1))
         else:
             self.set_memory(address, self.agc_add(value, 1))
-        self.cycle_count += 2
+        self.state.cycle_count += 2
 
     def bzf(self, address):
-        if self.agc_is_zero(self.accumulator) or not self.agc_is_negative(self.accumulator):
-            self.program_counter = address
-        self.cycle_count += 2
+        state = self.state
+        if self.agc_is_zero(state.accumulator) or not self.agc_is_negative(state.accumulator):
+            state.program_counter = address
+        state.cycle_count += 2
 
     def bzm(self, address):
-        if self.agc_is_negative(self.accumulator) and not self.agc_is_zero(self.accumulator):
-            self.program_counter = address
-        self.cycle_count += 2
+        state = self.state
+        if self.agc_is_negative(state.accumulator) and not self.agc_is_zero(state.accumulator):
+            state.program_counter = address
+        state.cycle_count += 2
 
     def relint(self):
-        self.interrupt_enabled = True
-        self.cycle_count += 1
+        self.state.interrupt_enabled = True
+        self.state.cycle_count += 1
 
     def inhint(self):
-        self.interrupt_enabled = False
-        self.cycle_count += 1
+        self.state.interrupt_enabled = False
+        self.state.cycle_count += 1
 
     def edrupt(self, vector):
-        if self.interrupt_enabled:
+        state = self.state
+        if state.interrupt_enabled:
             self.interrupt_pending.append(("EDRUPT", 1, vector))
-        self.cycle_count += 1
+        state.cycle_count += 1
 
     def resume(self):
-        self.interrupt_active = False
-        self.program_counter = self.interrupt_return
-        self.cycle_count += 1
+        state = self.state
+        state.interrupt_active = False
+        state.program_counter = state.interrupt_return
+        state.cycle_count += 1
 
     def cyr(self, address):
         val = self.get_memory(address)
         lsb = val & 1
         val = (val >> 1) | (lsb << 14)
         self.set_memory(address, val & self.WORD_MASK)
-        self.cycle_count += 2
+        self.state.cycle_count += 2
 
     def sr(self, address):
         self.set_memory(address, (self.get_memory(address) >> 1) & self.WORD_MASK)
-        self.cycle_count += 2
+        self.state.cycle_count += 2
 
     def sl(self, address):
         self.set_memory(address, (self.get_memory(address) << 1) & self.WORD_MASK)
-        self.cycle_count += 2
+        self.state.cycle_count += 2
 
     def pinc(self, address):
         if not self.agc_is_negative(self.get_memory(address)):
             self.set_memory(address, self.agc_add(self.get_memory(address), 1))
-        self.cycle_count += 2
+        self.state.cycle_count += 2
 
     def minc(self, address):
         if self.agc_is_negative(self.get_memory(address)):
             self.set_memory(address, self.agc_add(self.get_memory(address), 1))
-        self.cycle_count += 2
+        self.state.cycle_count += 2
 
     def dxch(self, address):
-        temp_a = self.accumulator
-        temp_l = self.L
-        self.accumulator = self.get_memory(address)
-        self.L = self.get_memory((address + 1) % self.ERASE_SIZE)
+        state = self.state
+        temp_a = state.accumulator
+        temp_l = state.L
+        state.accumulator = self.get_memory(address)
+        state.L = self.get_memory((address + 1) % self.ERASE_SIZE)
         self.set_memory(address, temp_a)
         self.set_memory((address + 1) % self.ERASE_SIZE, temp_l)
-        self.cycle_count += 4
+        state.cycle_count += 4
 
     def caf(self, address):
-        self.accumulator = self.get_memory(address, is_fixed=True)
-        self.cycle_count += 2
+        state = self.state
+        state.accumulator = self.get_memory(address, is_fixed=True)
+        state.cycle_count += 2
 
     def tcaf(self, address):
-        self.accumulator = self.get_memory(address, is_fixed=True)
-        self.program_counter = address
-        self.cycle_count += 2
+        state = self.state
+        state.accumulator = self.get_memory(address, is_fixed=True)
+        state.program_counter = address
+        state.cycle_count += 2
 
     def rand(self, address):
+        state = self.state
         value = self.interface_counter_read(address)
-        self.interface_counter_write(address, 0)
-        self.accumulator = value if value is not None else 0
-        self.cycle_count += 2
+        self.interface_counter_write(address, 0, emit=False)  # Clearing is not an output word
+        state.accumulator = value if value is not None else 0
+        state.cycle_count += 2
 
     def mask(self, mask):
-        self.accumulator &= mask & self.WORD_MASK
-        self.cycle_count += 1
+        state = self.state
+        state.accumulator &= mask & self.WORD_MASK
+        state.cycle_count += 1
 
     def read(self, address):
+        state = self.state
         value = self.interface_counter_read(address)
-        self.accumulator = value if value is not None else 0
-        self.cycle_count += 2
+        state.accumulator = value if value is not None else 0
+        state.cycle_count += 2
 
     def write(self, address):
-        self.interface_counter_write(address, self.accumulator)
-        self.cycle_count += 2
+        state = self.state
+        self.interface_counter_write(address, state.accumulator)
+        state.cycle_count += 2
 
     def noop(self):
-        self.cycle_count += 1
+        self.state.cycle_count += 1
 
     # --- Interrupt Handling ---
     def trigger_interrupt(self, interrupt_type):
-        if self.interrupt_enabled and interrupt_type in self.INTERRUPT_VECTORS:
+        state = self.state
+        if state.interrupt_enabled and interrupt_type in self.INTERRUPT_VECTORS:
             priority = {"T3RUPT": 3, "T4RUPT": 2, "T5RUPT": 1, "DSRUPT": 2, "KEYRUPT": 1, "EDRUPT": 1}[interrupt_type]
             self.interrupt_pending.append((interrupt_type, priority, self.INTERRUPT_VECTORS[interrupt_type]))
             self.interrupt_pending.sort(key=lambda x: x[1], reverse=True)  # Sort by priority
 
     def process_interrupts(self):
-        if self.interrupt_enabled and self.interrupt_pending and not self.interrupt_active:
+        state = self.state
+        if state.interrupt_enabled and self.interrupt_pending and not state.interrupt_active:
             interrupt_type, _, vector = self.interrupt_pending.pop(0)
-            self.interrupt_active = True
-            self.interrupt_return = self.program_counter
-            self.program_counter = vector
-            self.cycle_count += 2
+            state.interrupt_active = True
+            state.interrupt_return = state.program_counter
+            state.program_counter = vector
+            state.cycle_count += 2
 
     # --- Timer Simulation ---
     def update_timers(self):
+        state = self.state
          # Check for time3 overflow before incrementing
-        old_time3 = self.time3
-        self.time1 = self.agc_add(self.time1, 1)  # Increment every 10ms
-        self.time3 = self.agc_add(self.time3, 1)
+        old_time3 = state.time3
+        state.time1 = self.agc_add(state.time1, 1)  # Increment every 10ms
+        state.time3 = self.agc_add(state.time3, 1)
         if old_time3 == 0x7FFF:  # Detect overflow from max value
             self.trigger_interrupt("T3RUPT")
-        self.cycle_count += 1
+        state.cycle_count += 1
 
     # --- DSKY Simulation ---
     def dsky_input(self, verb, noun):
@@ -454,7 +1219,7 @@ class AGC:
         self.dsky_noun = noun & 0x7F  # 7-bit noun
         self.dsky_buffer.append((verb, noun))
         self.trigger_interrupt("KEYRUPT")
-        self.cycle_count += 1
+        self.state.cycle_count += 1
 
     def dsky_output(self):
         if self.dsky_buffer:
@@ -464,19 +1229,58 @@ class AGC:
             return self.dsky_display
         return None
 
-    # --- Peripheral Stubs ---
+    # --- Peripheral Channels ---
+    def attach_channel(self, idx, channel=None):
+        """Attach an IOChannel to interface counter idx and return it."""
+        if not 0 <= idx < len(self.interface_counters):
+            raise ValueError(f"Invalid interface counter: {idx}")
+        if channel is None:
+            channel = IOChannel()
+        self.channels[idx] = channel
+        return channel
+
+    def service_channel(self, idx):
+        """Apply pending counts (COUNTER) or latch the next inbound word (WORDS) into counter idx."""
+        channel = self.channels.get(idx)
+        if channel is None:
+            return
+        if channel.mode == IOChannel.COUNTER:
+            pinc, minc = channel.pending_pinc, channel.pending_minc
+            if pinc or minc:
+                channel.pending_pinc = channel.pending_minc = 0
+                net = pinc - minc
+                steps = abs(net) % self.NEG_ZERO  # One's complement counters wrap mod 2^15 - 1
+                if net > 0:
+                    self.interface_counters[idx] = self.agc_add(self.interface_counters[idx], steps)
+                elif net < 0:
+                    self.interface_counters[idx] = self.agc_sub(self.interface_counters[idx], steps)
+                self.state.cycle_count += pinc + minc  # Each increment steals one memory cycle
+        elif channel.inbound:
+            self.interface_counters[idx] = channel.inbound.popleft() & self.WORD_MASK
+
+    def service_counters(self):
+        """Apply pending increments on every COUNTER channel (called from run() after each instruction)."""
+        for idx, channel in self.channels.items():
+            if channel.mode == IOChannel.COUNTER and (channel.pending_pinc or channel.pending_minc):
+                self.service_channel(idx)
+
     def interface_counter_read(self, idx):
         if 0 <= idx < len(self.interface_counters):
+            if idx in self.channels:
+                self.service_channel(idx)
             return self.interface_counters[idx]
         return None
 
-    def interface_counter_write(self, idx, value):
+    def interface_counter_write(self, idx, value, emit=True):
         if 0 <= idx < len(self.interface_counters):
             self.interface_counters[idx] = value & self.WORD_MASK
+            if emit and idx in self.channels:
+                self.channels[idx].emit(value & self.WORD_MASK)
 
     # --- Instruction Decoder ---
     def decode_instruction(self, word):
-        if self.extended_mode:
+        state = self.state
+        if state.extended_mode:
             opcode = (word >> 10) & 0o77  # Extended opcodes use 6 bits
             address = word & 0o1777       # 10-bit address for extended instructions
         else:
@@ -491,55 +1295,70 @@ class AGC:
 
     def execute_instruction_list(self, instruction):
         """Compatibility method to execute instructions provided as a list (e.g., ['AD', 1])."""
+        state = self.state
         if not instruction:
             return
         opcode_str = instruction[0]
         args = instruction[1:] if len(instruction) > 1 else []
 
-        # Map string opcodes to numeric opcodes
-        opcode_map = {
-            "TC": 0o00, "CCS": 0o01, "INDEX": 0o02, "XCH": 0o03, "CA": 0o04,
-            "CS": 0o05, "TS": 0o06, "AD": 0o07, "MSK": 0o10, "EXTEND": 0o11,
-            "MP": 0o12, "DV": 0o13, "SU": 0o14, "DCA": 0o15, "DCS": 0o16,
-            "DAD": 0o17, "DSU": 0o20, "DAS": 0o21, "LXCH": 0o22, "QXCH": 0o23,
-            "INCR": 0o24, "AUG": 0o25, "DIM": 0o26, "BZF": 0o27, "BZM": 0o30,
-            "RELINT": 0o31, "INHINT": 0o32, "EDRUPT": 0o33, "RESUME": 0o34,
-            "CYR": 0o35, "SR": 0o36, "SL": 0o37, "PINC": 0o40, "MINC": 0o41,
-            "DXCH": 0o42, "CAF": 0o43, "TCAF": 0o44, "RAND": 0o45, "MASK": 0o46,
-            "READ": 0o47, "WRITE": 0o50, "NOOP": 0o51
-        }
-        if opcode_str not in opcode_map:
+        if opcode_str not in self.OPCODE_MAP:
             raise ValueError(f"Unknown instruction: {opcode_str}")
-        opcode = opcode_map[opcode_str]
+        opcode = self.OPCODE_MAP[opcode_str]
         if args:
             address = args[0]
             # Simulate instruction in memory
             instruction_word = (opcode << 12) | (address & 0o7777)
-            self.set_memory(self.program_counter, instruction_word, is_fixed=True)
-        self.instruction_set[opcode](address if args else 0)
+            self.set_memory(state.program_counter, instruction_word, is_fixed=True)
+        self._dispatch[opcode](self, address if args else 0)
         if opcode != 0o00:  # TC doesn't increment PC
-            self.program_counter = self.agc_add(self.program_counter, 1)
-        if self.extended_mode and opcode != 0o11:  # EXTEND
-            self.extended_mode = False
+            state.program_counter = self.agc_add(state.program_counter, 1)
+        if state.extended_mode and opcode != 0o11:  # EXTEND
+            state.extended_mode = False
         self.process_interrupts()
     
     def execute_instruction(self):
         """Fetch, decode, and execute an instruction from the current program counter."""
-        if self.program_counter >= self.FIXED_SIZE:
-            self.parity_fail = True
+        state = self.state
+        if state.program_counter >= self.FIXED_SIZE:
+            state.parity_fail = True
             return
-        instruction_word = self.get_memory(self.program_counter, is_fixed=True)
+        memory = self._memory  # Inlined get_memory(pc, is_fixed=True); pc is range-checked above
+        if memory is None:
+            instruction_word = 0
+        else:
+            instruction_word = memory[(state.fixed_bank * self.BANK_SIZE + state.program_counter) % self.FIXED_SIZE]
         opcode, address = self.decode_instruction(instruction_word)
-        if opcode in self.instruction_set:
-            self.instruction_set[opcode](address)
+        handler = self._dispatch.get(opcode)
+        if handler is not None:
+            handler(self, address)
         if opcode != 0o00:  # TC doesn't increment PC
-            self.program_counter = self.agc_add(self.program_counter, 1)
-        if self.extended_mode and opcode != 0o11:  # EXTEND
-            self.extended_mode = False
+            state.program_counter = self.agc_add(state.program_counter, 1)
+        if state.extended_mode and opcode != 0o11:  # EXTEND
+            state.extended_mode = False
             self.process_interrupts()
         else:
-            self.parity_fail = True  # Unknown opcode
-        self.cycle_count += 1
+            state.parity_fail = True  # Unknown opcode
+        state.cycle_count += 1
+
+    def run(self, cycles, observers=()):
+        """
+        Execute instructions for at least `cycles` cycles, calling each observer(agc)
+        once before the first instruction (so it sees the starting state) and after every instruction.
+        """
+        state = self.state
+        target = state.cycle_count + cycles
+        for observer in observers:
+            observer(self)
+        while state.cycle_count < target:
+            before = state.cycle_count
+            self.execute_instruction()
+            if self.channels:
+                self.service_counters()
+            for observer in observers:
+                observer(self)
+            if state.cycle_count == before:  # PC out of range; nothing left to execute
+                break
+        return state.cycle_count
 
     # --- Program Loader ---
     def load_program(self, program, start_address=0, is_fixed=True):
@@ -548,29 +1367,40 @@ class AGC:
             self.set_memory(start_address + i, word, is_fixed)
 
     def reset(self):
-        self.memory = [0] * self.FIXED_SIZE
-        self.erasable_memory = [0] * self.ERASE_SIZE
-        self.fixed_bank = 0
-        self.erase_bank = 0
-        self.L = 0
-        self.Q = 0
-        self.accumulator = 0
-        self.program_counter = 0
-        self.extended_mode = False
-        self.extended_address = None
-        self.interrupt_enabled = True
+        self._memory = None
+        self._erasable_memory = None
+        self._page_flags = bytearray(self.PAGE_COUNT)
+        self._page_digests = None
+        self._memory_digest = 0
+        self.state.reset()  # In place, so references to agc.state stay valid
         self.interrupt_pending = []
-        self.interrupt_active = False
-        self.interrupt_return = 0
-        self.time1 = 0
-        self.time3 = 0
-        self.cycle_count = 0
         self.dsky_verb = 0
         self.dsky_noun = 0
         self.dsky_buffer = []
         self.dsky_display = [""] * 6
-        self.interface_counters = [0] * 16
-        self.parity_fail = False
+        self.interface_counters = [0] * 16  # Attached channels stay attached, like peripherals across a restart
+
+
+def find_first_divergence(replay_a, replay_b, steps):
+    """
+    Bisect two runs for the first step at which their state digests differ.
+    replay_a/replay_b take a step count and return an AGC (or digest) after that many steps.
+    Returns None if the runs agree after `steps` steps; assumes runs stay diverged once they differ.
+    """
+    def digest(replay, n):
+        state = replay(n)
+        return state if isinstance(state, int) else state.state_digest()
+
+    if digest(replay_a, steps) == digest(replay_b, steps):
+        return None
+    lo, hi = 0, steps  # Agree at lo (assumed for 0), differ at hi
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if digest(replay_a, mid) == digest(replay_b, mid):
+            lo = mid
+        else:
+            hi = mid
+    return hi
 
 def test_agc():
     agc = AGC()
@@ -708,10 +1538,329 @@ def test_agc():
     agc.set_memory(10, 0xFFFF)  # Invalid parity
     assert agc.parity_fail, "Parity error not detected"
 
+    # Test 7: State digest
+    digest = agc.state_digest()
+    agc.rehash()
+    assert agc.state_digest() == digest, "Incremental digest out of sync with a full rehash"
+    direct = AGC()
+    direct.erasable_memory[5] = 1
+    assert not direct.same_state(AGC()), "Direct memory writes must change the digest"
+    direct.erasable_memory[5] = 0
+    assert direct.same_state(AGC()), "Undoing a direct write should restore the digest"
+    direct.interrupt_pending.append(("T3RUPT", 3, 0x4004))
+    assert not direct.same_state(AGC()), "Pending interrupts must change the digest"
+    other = AGC()
+    assert not agc.same_state(other), "Digest should differ"
+    other.set_memory(10, 0x1234)
+    other.set_memory(10, 0)
+    other.parity_fail = False  # Writing 0 trips the odd-parity check, which the digest now covers
+    assert other.same_state(AGC()), "Digest should be restored after undoing a write"
+    def replay(steps):
+        sim = AGC()
+        for i in range(steps):
+            sim.set_memory(i, 7 if i == 5 else 1)
+        return sim
+    def replay_other(steps):
+        sim = AGC()
+        for i in range(steps):
+            sim.set_memory(i, 1)
+        return sim
+    assert find_first_divergence(replay, replay_other, 20) == 6, "Divergence bisection failed"
+
+    # Test 7b: Startup structure
+    fresh = AGC()
+    assert fresh._memory is None and fresh._erasable_memory is None, "Memory should be allocated lazily"
+    assert fresh._dispatch is AGC()._dispatch, "Dispatch table should be shared per class"
+    try:
+        fresh.instruction_set[0o00] = fresh.noop
+        assert False, "instruction_set should be read-only"
+    except TypeError:
+        pass
+
+    # Test 8: I/O channels
+    io = AGC()
+    imu = io.attach_channel(3, IOChannel(mode=IOChannel.COUNTER))
+    imu.inject_counts(5)
+    imu.inject_counts([1, -1, -1, -1])
+    cycles = io.cycle_count
+    io.execute_instruction_list(["READ", 3])
+    assert io.accumulator == 3, "Counter increments not applied"
+    assert io.cycle_count - cycles == 2 + 9, "Each PINC/MINC should steal a cycle"
+    imu.inject_counts(1000)
+    imu.inject_counts(-1000)
+    io.run(1)
+    assert io.interface_counters[3] == 3 and imu.pending_pinc == imu.pending_minc == 0, "run() should apply counts"
+    radar = io.attach_channel(6)
+    radar.feed([0o123, 0o456])
+    io.execute_instruction_list(["RAND", 6])
+    assert io.accumulator == 0o123 and io.interface_counters[6] == 0, "Inbound word not read"
+    for wrong_mode in (lambda: imu.feed([1]), lambda: radar.inject_counts(1)):
+        try:
+            wrong_mode()
+            assert False, "Channel modes should be exclusive"
+        except ValueError:
+            pass
+    downlink = io.attach_channel(4, IOChannel(capacity=2))
+    for word in (1, 2, 3):
+        io.accumulator = word
+        io.execute_instruction_list(["WRITE", 4])
+    assert downlink.drain() == [2, 3] and downlink.dropped == 1, "Downlink ring buffer failed"
+
+    # Test 8b: One simulated second of 3200 words/s uplink/downlink plus gyro counts through run()
+    link = AGC()
+    words_per_second = 3200
+    uplink = link.attach_channel(6)
+    relay = link.attach_channel(7, IOChannel(capacity=words_per_second))
+    uplink.feed(range(1, words_per_second + 1))
+    received = []
+    for word in range(words_per_second):
+        link.execute_instruction_list(["READ", 6])
+        link.execute_instruction_list(["WRITE", 7])
+        if word % 320 == 319:  # Host drains ten times per simulated second
+            received.extend(relay.drain())
+    assert received == list(range(1, words_per_second + 1)), "Relayed words lost or reordered"
+    assert not uplink.inbound and relay.dropped == 0, "Uplink not consumed or downlink dropped words"
+    assert link.cycle_count == 4 * words_per_second, "READ/WRITE relay should cost four cycles per word"
+    gyro = link.attach_channel(3, IOChannel(mode=IOChannel.COUNTER))
+    cycles_per_tick = 85_333 // 10  # 1.024 MHz / 12 per memory cycle, ticked at 10 Hz
+    start = link.cycle_count
+    for tick in range(10):
+        gyro.inject_counts([1] * 200 + [-1] * 120)
+        link.run(cycles_per_tick)
+        assert gyro.pending_pinc == gyro.pending_minc == 0, "run() left counts pending"
+        assert link.interface_counters[3] == 80 * (tick + 1), "Gyro net count wrong"
+    assert 10 * cycles_per_tick <= link.cycle_count - start < 10 * (cycles_per_tick + 320), \
+        "run() should cover one simulated second, counting stolen cycles against the budget"
+    link.reset()
+    assert link.channels == {3: gyro, 6: uplink, 7: relay} and link.interface_counters[3] == 0, \
+        "reset() should keep attached channels and clear the counters"
+    uplink.feed([0o77])
+    link.execute_instruction_list(["READ", 6])
+    assert link.accumulator == 0o77, "Channel should keep working after reset()"
+
+    # Test 9: Telemetry frames
+    import io as _io
+    sink = _io.BytesIO()
+    sim = AGC()
+    sim.set_memory(7, 0o1234)
+    recorder = TelemetryRecorder(sink, addresses=[7], registers=["cycle_count"], interval=10, samples_per_frame=4)
+    sim.run(95, observers=[recorder])
+    sim.erasable_memory[7] = 0x1FFFF  # Out-of-range word must be masked, not crash the packer
+    recorder.sample(sim)
+    recorder.close()
+    frames = list(TelemetryRecorder.decode_frames(sink.getvalue(), 2, 4))
+    samples = [sample for _, frame in frames for sample in frame]
+    assert len(sink.getvalue()) == recorder.frame_size * len(frames), "Frames should be fixed size"
+    assert [seq for seq, _ in frames] == list(range(len(frames))), "Frame sequence broken"
+    assert len(samples) == 11 and all(values[0] == 0o1234 for _, values in samples[:10]), "Telemetry samples wrong"
+    assert samples[10][1][0] == 0xFFFF and recorder.frames_dropped == 0, "Memory words should be masked to 16 bits"
+
+    # Test 9b: Telemetry sink failure
+    class FailingSink:
+        def write(self, data):
+            raise OSError("disk full")
+    recorder = TelemetryRecorder(FailingSink(), registers=["cycle_count"], interval=2, samples_per_frame=1,
+                                 max_pending_frames=1)
+    try:
+        AGC().run(500, observers=[recorder])
+        assert False, "Sink failure should reach the simulator"
+    except OSError:
+        pass
+    recorder.close()
+    recorder.close()
+    assert recorder.frames_dropped >= 1 and recorder.frames_written == 0, "Failed frames should count as dropped"
+
+    # Test 10: Checkpoints
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        sim = AGC()
+        sim.load_program([0o70010, 0o30011, 0o00000])  # AD 8; XCH 9; TC 0
+        sim.set_memory(8, 3)
+        checkpointer = Checkpointer(directory, interval=50, full_every=3)
+        sim.run(400, observers=[checkpointer])
+        entries = checkpointer.checkpoints()
+        assert entries[0][1] and not entries[1][1], "Expected full then incremental checkpoints"
+        resumed = Checkpointer(directory, interval=50, full_every=3).resume()
+        assert resumed.cycle_count == entries[-1][0], "Resume should load the latest checkpoint"
+        reference = AGC()
+        reference.load_program([0o70010, 0o30011, 0o00000])
+        reference.set_memory(8, 3)
+        reference.run(233)
+        target = reference.cycle_count
+        seeked = checkpointer.seek(233)
+        assert seeked.cycle_count == target and seeked.same_state(reference), "Seek replay diverged"
+        assert seeked.erasable_memory[9] == reference.erasable_memory[9] != 0, "Dirty pages not restored"
+        start = AGC()
+        start.load_program([0o70010, 0o30011, 0o00000])
+        start.set_memory(8, 3)
+        assert checkpointer.restore(0).same_state(start), "Initial checkpoint should precede the first instruction"
+
+        # Snapshots taken at the same cycle must all survive and chain in order
+        same = Checkpointer(os.path.join(directory, "same"))
+        same.checkpoint(start)
+        start.erasable_memory[300] = 1
+        same.checkpoint(start, full=False)
+        start.erasable_memory[600] = 2
+        looped = same.checkpoint(start, full=False)
+        assert len(same.checkpoints()) == 3, "Same-cycle checkpoints overwrote each other"
+        assert same.restore().same_state(start), "Same-cycle incremental chain not restored"
+        import json
+        import zlib
+        with open(looped, "rb") as f:
+            snapshot = json.loads(zlib.decompress(f.read()))
+        snapshot["parent"] = os.path.basename(looped)[:-len(Checkpointer.SUFFIX)]
+        with open(looped, "wb") as f:
+            f.write(zlib.compress(json.dumps(snapshot).encode()))
+        try:
+            same.restore()
+            assert False, "A checkpoint naming itself as parent should be rejected"
+        except ValueError:
+            pass
+
+        # A second, shorter run in the same directory must not pick up the first run's snapshots
+        short = AGC()
+        short.load_program([0o70010, 0o00000])  # AD 8; TC 0
+        short.set_memory(8, 5)
+        second = Checkpointer(directory, interval=50, full_every=3)
+        short.run(120, observers=[second])
+        assert second.run != checkpointer.run, "Each run needs its own namespace"
+        last = second.checkpoints()[-1][0]
+        resumed = Checkpointer(directory, interval=50, full_every=3).resume()
+        expected = AGC()
+        expected.load_program([0o70010, 0o00000])
+        expected.set_memory(8, 5)
+        expected.run(last)
+        assert resumed.cycle_count == last and resumed.same_state(expected), "Resume mixed runs"
+
+    # Test 11: Slotted CPU state
+    sim = AGC()
+    sim.accumulator = 0o17
+    assert sim.state.accumulator == 0o17 and not hasattr(sim, "__dict__"), "CPU state properties broken"
+    held = sim.state
+    sim.reset()
+    assert sim.state is held and held.accumulator == 0, "reset() should reinitialise CPUState in place"
+
     print("All tests passed!")
     print(f"Accumulator: {agc.accumulator}, Memory[2]: {agc.erasable_memory[2]}, Cycle Count: {agc.cycle_count}")
     print(f"DSKY Display: {agc.dsky_display}")
 
+# Startup regression budget in seconds. Local numbers: import ~0.3 ms before the backlog and
+# ~0.7 ms now (eager pickle/threading/queue imports cost ~10 ms); construct ~2 us (eager
+# allocation ~200 us); first instruction ~1 us.
+STARTUP_BUDGET = {"import": 3e-3, "construct": 50e-6, "first_instruction": 50e-6}
+
+def bench_startup(repeat=200, budget=STARTUP_BUDGET, import_runs=5):
+    """
+    Time import (fresh interpreter, cached bytecode, best of `import_runs`),
+    construction and the first executed instruction, failing if any exceeds `budget`.
+    """
+    import subprocess
+    import sys
+    import timeit
+
+    code = "import time; t = time.perf_counter(); import AGCSIM2; print(time.perf_counter() - t)"
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # Measure the import, not compiling the source
+    times = []
+    for _ in range(import_runs + 1):  # First run writes the bytecode cache
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+        times.append(float(out.stdout.strip()))
+    import_time = min(times[1:])
+
+    construct_time = min(timeit.repeat(AGC, number=repeat, repeat=5)) / repeat
+    agcs = []
+    first_instruction_time = min(
+        timeit.repeat(lambda: agcs.pop().execute_instruction(), number=repeat, repeat=5,
+                      setup=lambda: agcs.extend(AGC() for _ in range(repeat)))) / repeat
+
+    print(f"import: {import_time * 1e3:.3f} ms")
+    print(f"construct AGC(): {construct_time * 1e6:.1f} us")
+    print(f"first instruction: {first_instruction_time * 1e6:.1f} us")
+    measured = {"import": import_time, "construct": construct_time, "first_instruction": first_instruction_time}
+    over = {name: value for name, value in measured.items() if value > budget[name]}
+    assert not over, f"Startup regression: {over} exceeds budget {budget}"
+    return import_time, construct_time, first_instruction_time
+
+def bench_channels(words=1_000_000):
+    """Bulk channel throughput; AGC downlink runs at 51.2 kbit/s (~3200 words/s)."""
+    import time
+
+    agc = AGC()
+    channel = agc.attach_channel(5, IOChannel(capacity=words))
+    payload = list(range(words))
+
+    start = time.perf_counter()
+    channel.feed(payload)
+    feed_time = time.perf_counter() - start
+
+    counter = agc.attach_channel(6, IOChannel(mode=IOChannel.COUNTER))
+    deltas = [1, -1] * (words // 2)
+    start = time.perf_counter()
+    counter.inject_counts(deltas)
+    agc.service_channel(6)
+    count_time = time.perf_counter() - start
+
+    channel.outbound.extend(payload)
+    start = time.perf_counter()
+    drained = channel.drain()
+    drain_time = time.perf_counter() - start
+    assert len(drained) == words
+
+    print(f"feed: {words / feed_time / 1e6:.1f} M words/s")
+    print(f"inject_counts: {words / count_time / 1e6:.1f} M increments/s")
+    print(f"drain: {words / drain_time / 1e6:.1f} M words/s")
+    return feed_time, count_time, drain_time
+
+def bench_state(instructions=100000, repeat=15):
+    """
+    Per-instruction and per-write (set_memory) time and traced bytes per AGC instance,
+    with execute_instruction and state size compared against a dict-backed CPU state.
+    """
+    import timeit
+    import tracemalloc
+
+    class DictState:  # Pre-CPUState layout: the same fields in an instance __dict__
+        def __init__(self):
+            self.__dict__.update({name: getattr(CPUState(), name) for name in CPUState.__slots__})
+
+    def loop_program(state=None):
+        agc = AGC()
+        if state is not None:
+            agc.state = state
+        agc.load_program([0o70010, 0o30011, 0o00000])  # AD 8; XCH 9; TC 0
+        agc.set_memory(8, 3)
+        return agc
+
+    def traced_size(factory, count=2000):
+        tracemalloc.start()
+        objects = [factory() for _ in range(count)]
+        size = tracemalloc.get_traced_memory()[0] / len(objects)
+        tracemalloc.stop()
+        return size
+
+    agc = loop_program()
+    baseline = loop_program(DictState())
+    per_instruction = min(timeit.repeat(agc.execute_instruction, number=instructions, repeat=repeat)) / instructions
+    dict_instruction = min(timeit.repeat(baseline.execute_instruction, number=instructions,
+                                         repeat=repeat)) / instructions
+    per_write = min(timeit.repeat(lambda: agc.set_memory(9, 5), number=instructions, repeat=repeat)) / instructions
+    per_instance = traced_size(AGC)
+    slotted_state, dict_state = traced_size(CPUState), traced_size(DictState)
+
+    print(f"execute_instruction: {per_instruction * 1e9:.0f} ns (dict-backed state: {dict_instruction * 1e9:.0f} ns)")
+    print(f"set_memory: {per_write * 1e9:.0f} ns")
+    print(f"CPU state: {slotted_state:.0f} bytes (dict-backed: {dict_state:.0f} bytes)")
+    print(f"AGC instance: {per_instance:.0f} bytes")
+    return per_instruction, per_write, per_instance
+
+
 if __name__ == "__main__":
-    test_agc()
+    import sys
+    if "--bench" in sys.argv:
+        bench_startup()
+        bench_channels()
+        bench_state()
+    else:
+        test_agc()
 